@@ -5,87 +5,200 @@ Detects Craig folders and merges .aac files into a single optimized audio file
 """
 
 import argparse
+import functools
 import json
 import logging
+import math
 import os
 import re
+import shlex
+import shutil
 import subprocess
 import sys
+import tempfile
+import threading
 import time
+import wave
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import IO, Callable, List, Optional, Sequence, Tuple, Union
+
+try:
+    import mutagen
+except ImportError:  # Optional: durations fall back to ffprobe
+    mutagen = None
+
+# (output file, output format, quality level)
+OutputSpec = Tuple[Path, str, str]
+
+
+class _SafeNameTable(dict):
+    """str.translate table replacing characters outside [a-zA-Z0-9_-] with "_"
+
+    Entries are filled in lazily, so any Unicode character can be looked up.
+    """
+
+    def __missing__(self, codepoint: int) -> int:
+        char = chr(codepoint)
+        safe = char.isascii() and (char.isalnum() or char in "_-")
+        self[codepoint] = codepoint if safe else ord("_")
+        return self[codepoint]
+
+
+@functools.lru_cache(maxsize=64)
+def _amix_inputs(offset: int, num_inputs: int) -> str:
+    """Input pad labels [offset:a][offset+1:a]... for amix"""
+    return "".join([f"[{i}:a]" for i in range(offset, offset + num_inputs)])
+
 
 class CraigAudioMerger:
+    _CRAIG_PREFIX = "craig-"
+    _NATSORT_RE = re.compile(r"(\d+)")
+    _SAFE_NAME_TABLE = _SafeNameTable()
+    _QUALITY_MAP = {"low": "4", "medium": "2", "high": "0"}  # For -q:a (VBR)
+    _LOUDNORM_TARGET = "I=-16:TP=-1.5:LRA=11"
+    _CODEC_MAP = {
+        "mp3": "libmp3lame",
+        "wav": "pcm_s16le",
+        "ogg": "libvorbis",
+        "aac": "aac",
+    }
+    # ffprobe codec_name of streams that can be copied into each format as-is
+    _COPY_CODEC_MAP = {
+        "mp3": "mp3",
+        "wav": "pcm_s16le",
+        "ogg": "vorbis",
+        "aac": "aac",
+    }
+
     def __init__(self, base_directory: str = ".", output_dir: Optional[str] = None):
         self.base_directory = Path(base_directory)
         self.output_dir = Path(output_dir) if output_dir else self.base_directory
         self.supported_formats = [".aac", ".mp3", ".wav", ".m4a"]
-        self.craig_pattern = re.compile(r"craig-[a-zA-Z0-9_-]+")
         self.logger = logging.getLogger(__name__)
+        # Resolve binaries once instead of searching PATH on every spawn
+        self._ffmpeg_bin = shutil.which("ffmpeg") or "ffmpeg"
+        self._ffprobe_bin = shutil.which("ffprobe") or "ffprobe"
+        # ffprobe results keyed by (path, mtime_ns, size) so edited files are re-probed
+        self._probe_cached = functools.lru_cache(maxsize=512)(
+            self._get_audio_info_uncached
+        )
+        # Folder listings keyed by (path, mtime_ns); adding or removing a file
+        # changes the directory's mtime
+        self._scan_cached = functools.lru_cache(maxsize=128)(
+            self._scan_audio_files_uncached
+        )
 
-    def check_ffmpeg(self) -> bool:
-        """Check if FFmpeg is installed and meets minimum version"""
+    @functools.cached_property
+    def ffmpeg_version(self) -> Optional[Tuple[int, int]]:
+        """Installed FFmpeg (major, minor) version, detected once; None if unknown"""
         try:
             result = subprocess.run(
-                ["ffmpeg", "-version"],
+                [self._ffmpeg_bin, "-version"],
                 capture_output=True,
                 text=True,
                 check=True,
             )
-            version_match = re.search(r"ffmpeg version (\d+\.\d+)", result.stdout)
-            if version_match:
-                version = float(version_match.group(1))
-                if version < 4.0:
-                    self.logger.error(
-                        "FFmpeg version is too old (needs 4.0+ for loudnorm)"
-                    )
-                    return False
-                return True
-            return False
         except FileNotFoundError:
             self.logger.error(
                 "FFmpeg not found. Please install FFmpeg and ensure it's in your PATH."
             )
-            return False
+            return None
         except subprocess.CalledProcessError as e:
             self.logger.error(f"Error checking FFmpeg: {e}")
+            return None
+        version_match = re.search(r"ffmpeg version (\d+)\.(\d+)", result.stdout)
+        if version_match:
+            return tuple(int(part) for part in version_match.groups())
+        return None
+
+    @functools.cached_property
+    def ffmpeg_ok(self) -> bool:
+        """Check once if FFmpeg is installed and meets minimum version"""
+        version = self.ffmpeg_version
+        if version is None:
+            return False
+        if version < (4, 0):
+            self.logger.error("FFmpeg version is too old (needs 4.0+ for loudnorm)")
             return False
+        return True
 
     def detect_craig_folders(self) -> List[Path]:
         """Detect all Craig folders in the base directory"""
         craig_folders = [
             item
             for item in self.base_directory.iterdir()
-            if item.is_dir() and self.craig_pattern.match(item.name)
+            if self.is_craig_folder_name(item.name) and item.is_dir()
         ]
         return craig_folders
 
+    @classmethod
+    def is_craig_folder_name(cls, name: str) -> bool:
+        """Check that name is "craig-" followed by [a-zA-Z0-9_-] characters"""
+        if not name.startswith(cls._CRAIG_PREFIX):
+            return False
+        identifier = name[len(cls._CRAIG_PREFIX) :].replace("_", "").replace("-", "")
+        return identifier.isascii() and identifier.isalnum()
+
     def scan_audio_files(self, folder: Path) -> List[Path]:
-        """Scan for supported audio files in the given folder using glob"""
-        audio_files = []
-        for ext in self.supported_formats:
-            audio_files.extend(folder.glob(f"*{ext}"))
-        # Natural sort (handles Unicode and numbers properly)
-        audio_files.sort(
-            key=lambda x: [
-                int(s) if s.isdigit() else s.lower()
-                for s in re.split(r"(\d+)", x.name)
+        """Scan for supported audio files in the given folder, cached per version"""
+        folder = folder.resolve()
+        try:
+            # Errors propagate out of the cache, so failures are not memoized
+            return list(self._scan_cached(folder, folder.stat().st_mtime_ns))
+        except OSError as e:
+            self.logger.error(f"❌ Cannot read folder {folder}: {e}")
+            return []
+
+    def _scan_audio_files_uncached(
+        self, folder: Path, mtime_ns: int
+    ) -> Tuple[Path, ...]:
+        """List a folder's audio files (mtime_ns only keys the cache)"""
+        # One directory pass; DirEntry carries the file type, so no per-file stat
+        exts = set(self.supported_formats)
+        with os.scandir(folder) as it:
+            audio_files = [
+                Path(entry.path)
+                for entry in it
+                if os.path.splitext(entry.name)[1].lower() in exts
+                and entry.is_file()
             ]
+        # Natural sort (handles Unicode and numbers properly)
+        audio_files.sort(key=self._natkey)
+        return tuple(audio_files)
+
+    @classmethod
+    def _natkey(cls, path: Path) -> tuple:
+        """Natural sort key: digit runs compare as numbers, text case-insensitively"""
+        return tuple(
+            int(s) if s.isdigit() else s.lower()
+            for s in cls._NATSORT_RE.split(path.name)
         )
-        return audio_files
 
     def get_audio_info(self, file_path: Path) -> dict:
-        """Get audio file information using ffprobe"""
+        """Get audio file information using ffprobe, cached per file version"""
+        try:
+            stat = file_path.stat()
+        except OSError as e:
+            self.logger.debug(f"Error getting audio info for {file_path}: {e}")
+            return {}
+        return self._probe_cached(str(file_path), stat.st_mtime_ns, stat.st_size)
+
+    def _get_audio_info_uncached(
+        self, file_path: str, mtime_ns: int, size: int
+    ) -> dict:
+        """Run ffprobe on a file (mtime_ns and size only key the cache)"""
         try:
             cmd = [
-                "ffprobe",
+                self._ffprobe_bin,
                 "-v",
                 "quiet",
                 "-print_format",
                 "json",
                 "-show_format",
                 "-show_streams",
-                str(file_path),
+                file_path,
             ]
             result = subprocess.run(cmd, capture_output=True, text=True, check=True)
             return json.loads(result.stdout)
@@ -95,127 +208,416 @@ class CraigAudioMerger:
 
     def get_total_duration(self, input_files: List[Path]) -> float:
         """Estimate total duration from the longest input file"""
-        max_duration = 0.0
-        for file in input_files:
-            info = self.get_audio_info(file)
-            if "format" in info and "duration" in info["format"]:
-                duration = float(info["format"]["duration"])
-                if duration > max_duration:
-                    max_duration = duration
-        return max_duration
+        if not input_files:
+            return 0.0
+        # Lookups are independent; ffprobe fallbacks wait on a child process
+        with ThreadPoolExecutor(max_workers=min(len(input_files), 8)) as executor:
+            return max(executor.map(self.get_duration, input_files), default=0.0)
+
+    def get_duration(self, file_path: Path) -> float:
+        """Duration in seconds, read from the file itself when possible
+
+        WAV headers are read with the wave module and MP3/M4A/AAC with
+        mutagen (if installed); anything else goes through ffprobe.
+        """
+        suffix = file_path.suffix.lower()
+        if suffix == ".wav":
+            try:
+                with wave.open(str(file_path), "rb") as wav:
+                    if wav.getframerate() > 0:
+                        return wav.getnframes() / wav.getframerate()
+            except (OSError, EOFError, wave.Error) as e:
+                self.logger.debug(f"Error reading WAV header of {file_path}: {e}")
+        elif mutagen is not None and suffix in (".mp3", ".m4a", ".aac"):
+            try:
+                audio = mutagen.File(file_path)
+                if audio is not None and audio.info.length:
+                    return audio.info.length
+            except mutagen.MutagenError as e:
+                self.logger.debug(f"Error reading tags of {file_path}: {e}")
+        return self._duration(self.get_audio_info(file_path))
+
+    def _duration(self, info: dict) -> float:
+        """Duration in seconds from ffprobe output, 0.0 if unknown"""
+        if "format" in info and "duration" in info["format"]:
+            return float(info["format"]["duration"])
+        return 0.0
+
+    def get_concat_codec(self, input_files: List[Path]) -> Optional[str]:
+        """Return the codec shared by all inputs if they can be concatenated as-is
+
+        Inputs qualify when every file has the same codec, sample rate and
+        channel count; otherwise None is returned.
+        """
+        with ThreadPoolExecutor(max_workers=min(len(input_files), 8)) as executor:
+            infos = list(executor.map(self.get_audio_info, input_files))
+        params = set()
+        for info in infos:
+            streams = [
+                stream
+                for stream in info.get("streams", [])
+                if stream.get("codec_type") == "audio"
+            ]
+            if len(streams) != 1:
+                return None
+            stream = streams[0]
+            params.add(
+                (
+                    stream.get("codec_name"),
+                    stream.get("sample_rate"),
+                    stream.get("channels"),
+                )
+            )
+        if len(params) != 1:
+            return None
+        return params.pop()[0]
+
+    def write_concat_list(self, input_files: List[Path]) -> Path:
+        """Write a concat demuxer list file for the inputs and return its path"""
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=".txt", prefix="craig_concat_", delete=False, encoding="utf-8"
+        ) as f:
+            for file in input_files:
+                escaped = str(file.resolve()).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+        return Path(f.name)
 
     def build_ffmpeg_command(
         self,
         input_files: List[Path],
-        output_file: Path,
-        output_format: str,
-        quality_level: str,
+        output_specs: List[OutputSpec],
+        threads: int = 0,
+        measured_loudness: Optional[dict] = None,
     ) -> List[str]:
-        """Build optimized FFmpeg command for merging audio files"""
-        if not input_files:
-            raise ValueError("No input files provided")
+        """Build optimized FFmpeg command for merging audio files
+
+        The inputs are decoded, mixed and normalized once; with several
+        output_specs the result is split with asplit and encoded per output.
+        measured_loudness holds the pass 1 values from measure_loudness; when
+        given, loudnorm applies them as a linear gain instead of normalizing
+        dynamically.
+        """
+        return self._build_batched_command(
+            [(input_files, output_specs, measured_loudness)], threads
+        )
+
+    def _build_batched_command(
+        self,
+        merges: List[Tuple[List[Path], List[OutputSpec], Optional[dict]]],
+        threads: int = 0,
+    ) -> List[str]:
+        """Build one FFmpeg command performing several independent merges
+
+        Each (input_files, output_specs, measured_loudness) entry gets its
+        own mix graph and outputs, so FFmpeg starts up only once.
+        """
+        cmd = self._ffmpeg_base_command()
+
+        graphs = []
+        outputs = []
+        offset = 0
+        for k, (input_files, output_specs, measured_loudness) in enumerate(merges):
+            if not input_files:
+                raise ValueError("No input files provided")
+            if not output_specs:
+                raise ValueError("No output files provided")
+
+            # Add input files
+            for file in input_files:
+                cmd.extend(["-i", str(file)])
+
+            labels = [f"out{k}_{i}" for i in range(len(output_specs))]
+            graphs.append(
+                self._mix_filter(
+                    len(input_files),
+                    self._loudnorm_filter(measured_loudness),
+                    labels,
+                    offset,
+                )
+            )
+            outputs.extend(zip(labels, output_specs))
+            offset += len(input_files)
 
-        cmd = ["ffmpeg", "-y"]  # -y to overwrite output file
+        cmd.extend(self._filter_thread_args(threads))
+        cmd.extend(["-filter_complex", ";".join(graphs)])
 
-        # Add input files
-        for file in input_files:
-            cmd.extend(["-i", str(file)])
+        for label, (output_file, output_format, quality_level) in outputs:
+            cmd.extend(["-map", f"[{label}]"])
+            if threads > 0:
+                cmd.extend(["-threads", str(threads)])
+            cmd.extend(self._encoding_args(output_format, quality_level))
+            cmd.extend(self._metadata_args(output_file))
+            cmd.append(str(output_file))
+        return cmd
+
+    def _ffmpeg_base_command(self) -> List[str]:
+        """FFmpeg binary and global options shared by all merge commands"""
+        return [
+            self._ffmpeg_bin,
+            # Only errors on stderr, stop at the first one, never read the TTY
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-xerror",
+            "-nostdin",
+            "-y",  # -y to overwrite output file
+            # Machine-readable key=value progress on stdout instead of stderr stats
+            "-progress",
+            "pipe:1",
+            "-nostats",
+        ]
 
-        # Build filter_complex
-        num_inputs = len(input_files)
+    def _mix_filter(
+        self,
+        num_inputs: int,
+        loudnorm: str,
+        labels: Sequence[str] = ("out",),
+        offset: int = 0,
+    ) -> str:
+        """Build the filter graph mixing inputs offset.. into the output labels"""
         if num_inputs == 1:
-            filter_complex = "[0:a]loudnorm=I=-16:TP=-1.5:LRA=11[out]"
+            chain = f"[{offset}:a]{loudnorm}"
         else:
-            inputs_str = "".join(f"[{i}:a]" for i in range(num_inputs))
-            filter_complex = (
-                f"{inputs_str}amix=inputs={num_inputs}:duration=longest:"
-                "dropout_transition=2,loudnorm=I=-16:TP=-1.5:LRA=11[out]"
+            # normalize=0 (FFmpeg 4.4+): skip amix's 1/N scaling, loudnorm sets
+            # the level anyway
+            version = self.ffmpeg_version
+            normalize = ":normalize=0" if version and version >= (4, 4) else ""
+            chain = (
+                f"{_amix_inputs(offset, num_inputs)}amix=inputs={num_inputs}:"
+                f"duration=longest:dropout_transition=2{normalize},{loudnorm}"
             )
+        outputs_str = "".join(f"[{label}]" for label in labels)
+        if len(labels) == 1:
+            return f"{chain}{outputs_str}"
+        return f"{chain},asplit={len(labels)}{outputs_str}"
 
-        cmd.extend(["-filter_complex", filter_complex])
-        cmd.extend(["-map", "[out]"])
-
-        # Encoding settings based on format and quality
-        quality_map = {"low": "4", "medium": "2", "high": "0"}  # For -q:a (VBR)
-        codec_map = {
-            "mp3": "libmp3lame",
-            "wav": "pcm_s16le",
-            "ogg": "libvorbis",
-            "aac": "aac",
-        }
-        if output_format not in codec_map:
-            raise ValueError(f"Unsupported output format: {output_format}")
-
-        cmd.extend(
-            [
-                "-c:a",
-                codec_map[output_format],
-                "-q:a",
-                quality_map.get(quality_level, "2"),  # Default medium
-                "-ar",
-                "44100",
-                "-ac",
-                "2",
-                "-avoid_negative_ts",
-                "make_zero",
-            ]
+    def _loudnorm_filter(self, measured: Optional[dict] = None) -> str:
+        """loudnorm filter, single-pass or linear using pass 1 measurements"""
+        if not measured:
+            return f"loudnorm={self._LOUDNORM_TARGET}"
+        return (
+            f"loudnorm={self._LOUDNORM_TARGET}"
+            f":measured_I={measured['input_i']}"
+            f":measured_TP={measured['input_tp']}"
+            f":measured_LRA={measured['input_lra']}"
+            f":measured_thresh={measured['input_thresh']}"
+            f":offset={measured['target_offset']}"
+            ":linear=true"
         )
 
-        # Add metadata
-        clean_name = re.sub(r"^craig-", "", output_file.stem)
+    def _filter_thread_args(self, threads: int) -> List[str]:
+        """Cap filter threads so concurrent merges don't oversubscribe the CPU
+        (0 leaves the choice to FFmpeg)"""
+        if threads <= 0:
+            return []
+        return [
+            "-filter_threads",
+            str(threads),
+            "-filter_complex_threads",
+            str(threads),
+        ]
+
+    def measure_loudness(
+        self,
+        input_files: List[Path],
+        threads: int = 0,
+        concat_list: Optional[Path] = None,
+    ) -> Optional[dict]:
+        """Run loudnorm pass 1 over the mixed inputs and return its measurements
+
+        With concat_list, the inputs joined end to end by the concat demuxer
+        are measured instead of their mix. Returns None if the measurement
+        fails or the audio is silent, in which case the caller should fall
+        back to single-pass normalization.
+        """
+        # Keep the default log level: loudnorm prints its stats at info level
+        cmd = [self._ffmpeg_bin, "-hide_banner", "-nostdin", "-nostats"]
+        if concat_list is not None:
+            cmd.extend(["-f", "concat", "-safe", "0", "-i", str(concat_list)])
+            num_inputs = 1
+        else:
+            for file in input_files:
+                cmd.extend(["-i", str(file)])
+            num_inputs = len(input_files)
+        cmd.extend(self._filter_thread_args(threads))
         cmd.extend(
             [
-                "-metadata",
-                f"title=Merged {clean_name}",
-                "-metadata",
-                "artist=Craig Recording",
-                "-metadata",
-                f"date={time.strftime('%Y-%m-%d')}",
+                "-filter_complex",
+                self._mix_filter(
+                    num_inputs,
+                    f"loudnorm={self._LOUDNORM_TARGET}:print_format=json",
+                ),
+                "-map",
+                "[out]",
+                "-f",
+                "null",
+                "-",
             ]
         )
+        self.logger.info("📏 Measuring loudness (pass 1)...")
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+            # loudnorm prints its JSON summary at the end of stderr
+            stderr = result.stderr
+            stats = json.loads(stderr[stderr.rindex("{") : stderr.rindex("}") + 1])
+            measured = {
+                key: float(stats[key])
+                for key in (
+                    "input_i",
+                    "input_tp",
+                    "input_lra",
+                    "input_thresh",
+                    "target_offset",
+                )
+            }
+        except (subprocess.CalledProcessError, ValueError, KeyError) as e:
+            self.logger.warning(
+                f"⚠️  Loudness measurement failed, using single pass: {e}"
+            )
+            return None
+        if not all(math.isfinite(value) for value in measured.values()):
+            self.logger.warning("⚠️  Mix is silent, using single-pass loudnorm")
+            return None
+        return measured
+
+    def build_concat_command(
+        self,
+        concat_list: Path,
+        output_specs: List[OutputSpec],
+        input_codec: str,
+        threads: int = 0,
+        measured_loudness: Optional[dict] = None,
+    ) -> List[str]:
+        """Build FFmpeg command that concatenates inputs with the concat demuxer
 
-        cmd.append(str(output_file))
+        Streams are copied without re-encoding (and without normalization) to
+        every output whose format already uses the inputs' codec; the other
+        outputs are loudness normalized and encoded.
+        """
+        cmd = self._ffmpeg_base_command()
+        cmd.extend(["-f", "concat", "-safe", "0", "-i", str(concat_list)])
+        cmd.extend(self._filter_thread_args(threads))
+
+        for output_file, output_format, quality_level in output_specs:
+            cmd.extend(["-map", "0:a"])
+            if self._COPY_CODEC_MAP.get(output_format) == input_codec:
+                cmd.extend(["-c:a", "copy", "-avoid_negative_ts", "make_zero"])
+            else:
+                cmd.extend(["-af", self._loudnorm_filter(measured_loudness)])
+                if threads > 0:
+                    cmd.extend(["-threads", str(threads)])
+                cmd.extend(self._encoding_args(output_format, quality_level))
+            cmd.extend(self._metadata_args(output_file))
+            cmd.append(str(output_file))
         return cmd
 
+    def _encoding_args(self, output_format: str, quality_level: str) -> List[str]:
+        """Encoding settings based on format and quality"""
+        if output_format not in self._CODEC_MAP:
+            raise ValueError(f"Unsupported output format: {output_format}")
+        return [
+            "-c:a",
+            self._CODEC_MAP[output_format],
+            "-q:a",
+            self._QUALITY_MAP.get(quality_level, "2"),  # Default medium
+            "-ar",
+            "44100",
+            "-ac",
+            "2",
+            "-avoid_negative_ts",
+            "make_zero",
+        ]
+
+    def _metadata_args(self, output_file: Path) -> List[str]:
+        """Metadata tags for the merged file"""
+        clean_name = re.sub(r"^craig-", "", output_file.stem)
+        return [
+            "-metadata",
+            f"title=Merged {clean_name}",
+            "-metadata",
+            "artist=Craig Recording",
+            "-metadata",
+            f"date={time.strftime('%Y-%m-%d')}",
+        ]
+
     def execute_ffmpeg(
-        self, cmd: List[str], total_duration: float
+        self, cmd: List[str], total_duration: float, show_progress: bool = True
     ) -> Tuple[bool, str]:
-        """Execute FFmpeg command with progress monitoring"""
-        self.logger.info(f"Executing FFmpeg command (truncated): {' '.join(cmd[:5])}...")
+        """Execute FFmpeg command with progress monitoring
+
+        show_progress=False still drains FFmpeg's progress output but doesn't
+        print it, for when several merges share the terminal.
+        """
+        # Skip building the command strings when INFO is filtered out
+        if self.logger.isEnabledFor(logging.INFO):
+            # Show what is specific to this job, not the shared global options
+            base = self._ffmpeg_base_command()
+            job_args = cmd[len(base) :] if cmd[: len(base)] == base else cmd[1:]
+            self.logger.info(
+                f"Executing FFmpeg command (truncated): ffmpeg "
+                f"{' '.join(job_args[:6])}..."
+            )
+            self.logger.debug(f"Full FFmpeg command: {shlex.join(cmd)}")
         self.logger.info("Processing audio files...")
 
         try:
+            # Unbuffered binary pipes: _drain reads the descriptors directly and
+            # progress keys are matched as bytes, no decoding
             process = subprocess.Popen(
                 cmd,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                text=True,
-                universal_newlines=True,
+                bufsize=0,
             )
 
-            # Monitor progress
-            while True:
-                output = process.stderr.readline()
-                if output == "" and process.poll() is not None:
-                    break
-                if output and "time=" in output:
-                    time_match = re.search(r"time=(\d+:\d+:\d+\.\d+)", output)
-                    if time_match:
-                        current_time = self._time_to_seconds(time_match.group(1))
-                        percentage = (
-                            (current_time / total_duration) * 100
-                            if total_duration > 0
-                            else 0
-                        )
-                        sys.stdout.write(
-                            f"\rProgress: {time_match.group(1)} ({percentage:.1f}%)"
-                        )
-                        sys.stdout.flush()
+            # out_time_us appeared in FFmpeg 4.2; older versions only emit
+            # out_time_ms, which despite its name also holds microseconds
+            version = self.ffmpeg_version
+            progress_key = (
+                b"out_time_us=" if version and version >= (4, 2) else b"out_time_ms="
+            )
 
-            print()  # New line after progress
+            def report_progress(line: bytes) -> None:
+                if not show_progress or not line.startswith(progress_key):
+                    return
+                try:
+                    current_time = int(line[len(progress_key) :]) / 1_000_000
+                except ValueError:  # "N/A" before the first frame
+                    return
+                percentage = (
+                    (current_time / total_duration) * 100 if total_duration > 0 else 0
+                )
+                sys.stdout.write(
+                    f"\rProgress: {self._format_time(current_time)} "
+                    f"({percentage:.1f}%)"
+                )
+                sys.stdout.flush()
+
+            # Drain both pipes on their own threads so FFmpeg never blocks on a
+            # full pipe; only the tail of stderr is kept for error reporting
+            stderr_tail = deque(maxlen=200)
+            drains = [
+                threading.Thread(
+                    target=self._drain,
+                    args=(process.stdout, report_progress),
+                    daemon=True,
+                ),
+                threading.Thread(
+                    target=self._drain,
+                    args=(process.stderr, stderr_tail.append),
+                    daemon=True,
+                ),
+            ]
+            for drain in drains:
+                drain.start()
 
-            rc = process.poll()
-            stderr_output = process.stderr.read()
+            rc = process.wait()
+            for drain in drains:
+                drain.join()
+            if show_progress:
+                print()  # New line after progress
+
+            stderr_output = b"".join(stderr_tail).decode("utf-8", errors="replace")
             if rc == 0:
                 self.logger.info("✅ Audio merging completed successfully!")
                 return True, ""
@@ -226,18 +628,45 @@ class CraigAudioMerger:
             self.logger.error(f"❌ Error executing FFmpeg: {e}")
             return False, str(e)
 
-    def _time_to_seconds(self, time_str: str) -> float:
-        """Convert HH:MM:SS.ss to seconds"""
-        h, m, s = time_str.split(":")
-        return int(h) * 3600 + int(m) * 60 + float(s)
+    @staticmethod
+    def _drain(pipe: IO[bytes], handler: Callable[[bytes], None]) -> None:
+        """Feed each line read from a pipe to handler until EOF
+
+        Reads whatever is available in chunks straight from the descriptor
+        and splits lines here, so partial lines are carried over.
+        """
+        fd = pipe.fileno()
+        buffer = bytearray()
+        with pipe:
+            while True:
+                chunk = os.read(fd, 8192)
+                if not chunk:
+                    break
+                buffer += chunk
+                start = 0
+                end = buffer.find(b"\n")
+                while end >= 0:
+                    handler(bytes(buffer[start : end + 1]))
+                    start = end + 1
+                    end = buffer.find(b"\n", start)
+                del buffer[:start]
+        if buffer:
+            handler(bytes(buffer))
+
+    def _format_time(self, seconds: float) -> str:
+        """Format seconds as HH:MM:SS.ss"""
+        m, s = divmod(max(seconds, 0.0), 60)
+        h, m = divmod(int(m), 60)
+        return f"{h:02d}:{m:02d}:{s:05.2f}"
 
     def generate_output_filename(
         self, craig_folder: Path, output_format: str
     ) -> str:
         """Generate output filename based on Craig folder name"""
         folder_name = craig_folder.name
-        clean_name = re.sub(r"^craig-", "", folder_name)
-        clean_name = re.sub(r"[^a-zA-Z0-9_-]", "_", clean_name)
+        if folder_name.startswith(self._CRAIG_PREFIX):
+            folder_name = folder_name[len(self._CRAIG_PREFIX) :]
+        clean_name = folder_name.translate(self._SAFE_NAME_TABLE)
         timestamp = time.strftime("%Y%m%d_%H%M%S")
         return f"merged_{clean_name}_{timestamp}.{output_format}"
 
@@ -257,73 +686,267 @@ class CraigAudioMerger:
     def merge_audio_files(
         self,
         craig_folder: Path,
-        output_format: str = "mp3",
+        output_format: Union[str, Sequence[str]] = "mp3",
         quality_level: str = "medium",
         delete_originals: bool = False,
-    ) -> bool:
-        """Merge audio files from a Craig folder into a single output file"""
+        threads: int = 0,
+        mode: str = "mix",
+        two_pass: bool = False,
+        show_progress: bool = True,
+    ) -> List[Path]:
+        """Merge audio files from a Craig folder into a single output file
+
+        Returns the input files that were merged, or an empty list on failure.
+
+        output_format may list several formats; the mix is then computed once
+        and encoded to one file per format. mode is "mix" to overlay the
+        tracks, or "concat" to join them end to end (falls back to mixing when
+        the inputs' formats differ). two_pass measures the mix's loudness first
+        for more accurate normalization.
+        """
         try:
             # Scan for audio files
             audio_files = self.scan_audio_files(craig_folder)
             if not audio_files:
                 self.logger.error("❌ No supported audio files found in the folder.")
-                return False
+                return []
 
-            self.logger.info(f"🎵 Found {len(audio_files)} audio files:")
-            for i, file in enumerate(audio_files, 1):
-                self.logger.info(f"  {i}. {file.name}")
+            # Generate output filenames
+            output_specs = self.build_output_specs(
+                craig_folder, output_format, quality_level
+            )
+            output_files = [output_file for output_file, _, _ in output_specs]
+            self._log_merge_plan(audio_files, output_files)
 
-            # Generate output filename
-            output_filename = self.generate_output_filename(craig_folder, output_format)
-            output_file = self.output_dir / output_filename
-            self.logger.info(f"📤 Output file: {output_filename}")
+            concat_codec = None
+            if mode == "concat":
+                concat_codec = self.get_concat_codec(audio_files)
+                if concat_codec is None:
+                    self.logger.warning(
+                        "⚠️  Inputs differ in codec, sample rate or channels; "
+                        "mixing instead"
+                    )
 
-            # Get total duration for progress monitoring
-            total_duration = self.get_total_duration(audio_files)
+            if concat_codec:
+                success, error = self._concat_audio_files(
+                    audio_files,
+                    output_specs,
+                    concat_codec,
+                    threads,
+                    show_progress,
+                    two_pass,
+                )
+            else:
+                # Get total duration for progress monitoring
+                total_duration = self.get_total_duration(audio_files)
 
-            # Build and execute FFmpeg command
-            cmd = self.build_ffmpeg_command(
-                audio_files, output_file, output_format, quality_level
-            )
-            success, error = self.execute_ffmpeg(cmd, total_duration)
+                measured_loudness = (
+                    self.measure_loudness(audio_files, threads) if two_pass else None
+                )
 
-            if success and output_file.exists():
-                # Display file info
-                file_size = output_file.stat().st_size / (1024 * 1024)  # MB
-                self.logger.info(f"📊 Output file size: {file_size:.2f} MB")
-                
-                # Get duration if possible
-                output_info = self.get_audio_info(output_file)
-                if "format" in output_info and "duration" in output_info["format"]:
-                    duration = float(output_info["format"]["duration"])
-                    self.logger.info(f"⏱️  Duration: {duration/60:.2f} minutes")
+                # Build and execute FFmpeg command
+                cmd = self.build_ffmpeg_command(
+                    audio_files, output_specs, threads, measured_loudness
+                )
+                success, error = self.execute_ffmpeg(
+                    cmd, total_duration, show_progress
+                )
+
+            if success and all(output_file.exists() for output_file in output_files):
+                self._log_output_info(output_files)
 
                 # Delete originals if requested
                 if delete_originals:
                     self.delete_originals(audio_files)
 
-                return True
+                return audio_files
             else:
                 self.logger.error(f"❌ Merging failed: {error}")
-                return False
+                return []
 
         except Exception as e:
             self.logger.error(f"❌ Error processing {craig_folder}: {e}")
-            return False
+            return []
+
+    def _log_merge_plan(
+        self, audio_files: List[Path], output_files: List[Path]
+    ) -> None:
+        """Log the inputs and outputs of a folder's merge"""
+        self.logger.info(f"🎵 Found {len(audio_files)} audio files:")
+        for i, file in enumerate(audio_files, 1):
+            self.logger.info(f"  {i}. {file.name}")
+        for output_file in output_files:
+            self.logger.info(f"📤 Output file: {output_file.name}")
+
+    def _log_output_info(self, output_files: List[Path]) -> None:
+        """Log size and duration of merged files"""
+        for output_file in output_files:
+            # Display file info
+            file_size = output_file.stat().st_size / (1024 * 1024)  # MB
+            self.logger.info(
+                f"📊 Output file size ({output_file.suffix[1:]}): {file_size:.2f} MB"
+            )
+
+            # Get duration if possible
+            output_info = self.get_audio_info(output_file)
+            if "format" in output_info and "duration" in output_info["format"]:
+                duration = float(output_info["format"]["duration"])
+                self.logger.info(f"⏱️  Duration: {duration/60:.2f} minutes")
+
+    def merge_batched(
+        self,
+        craig_folders: List[Path],
+        output_format: Union[str, Sequence[str]] = "mp3",
+        quality_level: str = "medium",
+        threads: int = 0,
+        two_pass: bool = False,
+    ) -> List[Tuple[Path, List[Path]]]:
+        """Merge several Craig folders with a single FFmpeg invocation
+
+        Each folder still gets its own mix and output files. Returns each
+        successfully merged folder with the input files that were merged.
+        """
+        folders = []
+        merges = []
+        for folder in craig_folders:
+            self.logger.info("=" * 60)
+            self.logger.info(f"📁 Preparing Craig folder: {folder.name}")
+            audio_files = self.scan_audio_files(folder)
+            if not audio_files:
+                self.logger.error("❌ No supported audio files found in the folder.")
+                continue
+            output_specs = self.build_output_specs(folder, output_format, quality_level)
+            self._log_merge_plan(
+                audio_files, [output_file for output_file, _, _ in output_specs]
+            )
+            folders.append(folder)
+            merges.append((audio_files, output_specs))
+        if not merges:
+            return []
+
+        self.logger.info("=" * 60)
+        try:
+            workers = min(len(merges), 8)
+            # Pass 1 runs up to `workers` FFmpeg processes at once; share the
+            # thread budget between them (0 still leaves it to FFmpeg)
+            measure_threads = max(1, threads // workers) if threads > 0 else 0
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                # Graphs run side by side, so progress ends at the longest mix
+                total_duration = max(
+                    executor.map(
+                        self.get_total_duration, [files for files, _ in merges]
+                    )
+                )
+                measured = (
+                    list(
+                        executor.map(
+                            lambda files: self.measure_loudness(
+                                files, measure_threads
+                            ),
+                            [files for files, _ in merges],
+                        )
+                    )
+                    if two_pass
+                    else [None] * len(merges)
+                )
+
+            cmd = self._build_batched_command(
+                [
+                    (files, output_specs, measured_loudness)
+                    for (files, output_specs), measured_loudness in zip(
+                        merges, measured
+                    )
+                ],
+                threads,
+            )
+            success, error = self.execute_ffmpeg(cmd, total_duration)
+        except Exception as e:
+            self.logger.error(f"❌ Error processing batch: {e}")
+            return []
+        if not success:
+            self.logger.error(f"❌ Merging failed: {error}")
+            return []
+
+        merged_folders = []
+        for folder, (audio_files, output_specs) in zip(folders, merges):
+            output_files = [output_file for output_file, _, _ in output_specs]
+            if all(output_file.exists() for output_file in output_files):
+                self.logger.info(f"📁 {folder.name}")
+                self._log_output_info(output_files)
+                merged_folders.append((folder, audio_files))
+            else:
+                self.logger.error(f"❌ Missing output for {folder.name}")
+        return merged_folders
+
+    def build_output_specs(
+        self,
+        craig_folder: Path,
+        output_format: Union[str, Sequence[str]],
+        quality_level: str,
+    ) -> List[OutputSpec]:
+        """Output file, format and quality for each requested format"""
+        formats = [output_format] if isinstance(output_format, str) else output_format
+        formats = list(dict.fromkeys(formats))  # Drop duplicates, keep order
+        # One filename (and timestamp) shared by all formats
+        output_file = self.output_dir / self.generate_output_filename(
+            craig_folder, formats[0]
+        )
+        return [
+            (output_file.with_suffix(f".{fmt}"), fmt, quality_level) for fmt in formats
+        ]
+
+    def _concat_audio_files(
+        self,
+        audio_files: List[Path],
+        output_specs: List[OutputSpec],
+        input_codec: str,
+        threads: int = 0,
+        show_progress: bool = True,
+        two_pass: bool = False,
+    ) -> Tuple[bool, str]:
+        """Join audio files end to end with the concat demuxer"""
+        total_duration = sum(self.get_duration(file) for file in audio_files)
+        concat_list = self.write_concat_list(audio_files)
+        try:
+            copied = [
+                output_file
+                for output_file, output_format, _ in output_specs
+                if self._COPY_CODEC_MAP.get(output_format) == input_codec
+            ]
+            for output_file in copied:
+                self.logger.warning(
+                    f"⚠️  {output_file.name} is stream-copied and not normalized"
+                )
+            measured_loudness = (
+                self.measure_loudness(audio_files, threads, concat_list)
+                if two_pass and len(copied) < len(output_specs)
+                else None
+            )
+            cmd = self.build_concat_command(
+                concat_list, output_specs, input_codec, threads, measured_loudness
+            )
+            return self.execute_ffmpeg(cmd, total_duration, show_progress)
+        finally:
+            concat_list.unlink()
 
     def process_all_craig_folders(
         self,
-        output_format: str = "mp3",
+        output_format: Union[str, Sequence[str]] = "mp3",
         quality_level: str = "medium",
         delete_originals: bool = False,
         dry_run: bool = False,
+        jobs: Optional[int] = None,
+        mode: str = "mix",
+        threads: Optional[int] = None,
+        two_pass: bool = False,
+        batch: bool = False,
     ) -> None:
         """Process all Craig folders in the base directory"""
         self.logger.info("🎙️  Craig Audio Merger - Starting...")
         self.logger.info(f"📂 Scanning directory: {self.base_directory}")
 
         # Check FFmpeg
-        if not self.check_ffmpeg():
+        if not self.ffmpeg_ok:
             return
 
         # Detect Craig folders
@@ -341,10 +964,13 @@ class CraigAudioMerger:
             self.logger.info("🔍 Dry run mode - no files will be processed")
             for folder in craig_folders:
                 audio_files = self.scan_audio_files(folder)
-                output_filename = self.generate_output_filename(folder, output_format)
+                output_specs = self.build_output_specs(
+                    folder, output_format, quality_level
+                )
                 self.logger.info(f"\n📁 {folder.name}")
                 self.logger.info(f"  🎵 Audio files: {len(audio_files)}")
-                self.logger.info(f"  📤 Would create: {output_filename}")
+                for output_file, _, _ in output_specs:
+                    self.logger.info(f"  📤 Would create: {output_file.name}")
             return
 
         # Process each folder
@@ -352,14 +978,68 @@ class CraigAudioMerger:
         successful = 0
         failed = 0
 
-        for folder in craig_folders:
-            self.logger.info("=" * 60)
-            self.logger.info(f"📁 Processing Craig folder: {folder.name}")
+        if batch and mode == "concat":
+            self.logger.warning("⚠️  --batch only applies to mix mode, ignoring it")
+            batch = False
 
-            if self.merge_audio_files(folder, output_format, quality_level, delete_originals):
-                successful += 1
-            else:
-                failed += 1
+        cpu_count = os.cpu_count() or 1
+        if batch:
+            # One FFmpeg process for every folder
+            if threads is None:
+                threads = cpu_count
+            merged_folders = self.merge_batched(
+                craig_folders, output_format, quality_level, threads, two_pass
+            )
+            successful = len(merged_folders)
+            failed = total_folders - successful
+        else:
+            # Merge folders concurrently; each merge is a separate FFmpeg
+            # process, so worker threads spend their time waiting on the child.
+            jobs = max(1, min(jobs or cpu_count, total_folders))
+            if threads is None:
+                threads = max(1, cpu_count // jobs)
+            merged_folders = []
+
+            def merge_folder(folder: Path) -> List[Path]:
+                # Header is logged when the worker picks the folder up
+                self.logger.info("=" * 60)
+                self.logger.info(f"📁 Processing Craig folder: {folder.name}")
+                merged_files = self.merge_audio_files(
+                    folder,
+                    output_format,
+                    quality_level,
+                    False,  # Originals are deleted below, one prompt at a time
+                    threads,
+                    mode,
+                    two_pass,
+                    # Concurrent progress lines would overwrite each other
+                    show_progress=jobs == 1,
+                )
+                if jobs > 1:
+                    # Other folders' logs may be interleaved; name the outcome
+                    status = "✅ Merged" if merged_files else "❌ Failed"
+                    self.logger.info(f"{status}: {folder.name}")
+                return merged_files
+
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                futures = {
+                    executor.submit(merge_folder, folder): folder
+                    for folder in craig_folders
+                }
+
+                for future in as_completed(futures):
+                    merged_files = future.result()
+                    if merged_files:
+                        successful += 1
+                        merged_folders.append((futures[future], merged_files))
+                    else:
+                        failed += 1
+
+        if delete_originals:
+            # Only the files that went into each merge, never a fresh listing
+            for folder, merged_files in merged_folders:
+                self.logger.info(f"📁 {folder.name}")
+                self.delete_originals(merged_files)
 
         # Summary
         self.logger.info("=" * 60)
@@ -395,7 +1075,10 @@ Examples:
   python audio_merger.py -d /path/to/craig  # Process specific directory
   python audio_merger.py --dry-run          # Show what would be processed
   python audio_merger.py --format wav      # Output as WAV files
+  python audio_merger.py --format mp3 wav  # Output both MP3 and WAV files
   python audio_merger.py --quality high    # High quality output
+  python audio_merger.py --jobs 2          # Merge two folders at a time
+  python audio_merger.py --mode concat     # Join tracks end to end
         """
     )
     
@@ -412,9 +1095,11 @@ Examples:
     
     parser.add_argument(
         "--format",
+        nargs="+",
         choices=["mp3", "wav", "ogg", "aac"],
-        default="mp3",
-        help="Output format (default: mp3)"
+        default=["mp3"],
+        help="Output format(s); several formats share one decode and mix "
+        "(default: mp3)"
     )
     
     parser.add_argument(
@@ -424,6 +1109,19 @@ Examples:
         help="Output quality level (default: medium)"
     )
     
+    parser.add_argument(
+        "--mode",
+        choices=["mix", "concat"],
+        default="mix",
+        help="Mix tracks together, or concatenate them end to end (default: mix)"
+    )
+    
+    parser.add_argument(
+        "--two-pass",
+        action="store_true",
+        help="Measure loudness first, then normalize linearly (slower, more accurate)"
+    )
+    
     parser.add_argument(
         "--delete-originals",
         action="store_true",
@@ -436,6 +1134,25 @@ Examples:
         help="Show what would be processed without actually merging files"
     )
     
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        help="Number of Craig folders to merge in parallel (default: CPU count)"
+    )
+    
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Merge all folders with a single FFmpeg process (mix mode only)"
+    )
+    
+    parser.add_argument(
+        "--threads",
+        type=int,
+        help="FFmpeg threads per merge, 0 lets FFmpeg decide "
+        "(default: CPU count divided by --jobs)"
+    )
+    
     parser.add_argument(
         "-v", "--verbose",
         action="store_true",
@@ -455,7 +1172,12 @@ Examples:
         output_format=args.format,
         quality_level=args.quality,
         delete_originals=args.delete_originals,
-        dry_run=args.dry_run
+        dry_run=args.dry_run,
+        jobs=args.jobs,
+        mode=args.mode,
+        threads=args.threads,
+        two_pass=args.two_pass,
+        batch=args.batch
     )
 
 